@@ -1,121 +1,125 @@
 #!/usr/bin/env python3
 import subprocess
-import requests
-import datetime
 import re
-import os
 import shutil
+import functools
+from cron_common import (
+    CHECK_MINUTES, JOURNAL_GREP, journal_argv, read_journal, tail_file,
+    modified_within, send_discord_report
+)
 
 # ---------------- CONFIG ----------------
 DISCORD_WEBHOOK = "https://discord.com/api/webhooks/XXXXXXXXXXXXXXXXXXXXXXXXXx"
-CHECK_MINUTES = 10  # Look this far back in logs
 
-# ---------------- HELPERS ----------------
-def send_discord_report(results):
-    """Send a single embed summarizing all jobs."""
-    # Decide embed color
-    if any(r["status"] == "failed" for r in results):
-        color = 0xE74C3C  # red
-    elif any(r["status"] == "missing" for r in results):
-        color = 0xE67E22  # orange
-    else:
-        color = 0x2ECC71  # green
-
-    fields = []
-    for r in results:
-        status_icon = "✅" if r["status"] == "success" else "⚠️" if r["status"] == "missing" else "❌"
-        fields.append({
-            "name": f"{status_icon} {r['job']}",
-            "value": r["message"],
-            "inline": False
-        })
-
-    data = {
-        "embeds": [
-            {
-                "title": "🕒 Cron/Fcron Monitor Report",
-                "description": f"Checked the last **{CHECK_MINUTES} minutes** of logs.",
-                "color": color,
-                "fields": fields,
-                "footer": {
-                    "text": f"cron-monitor • {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                }
-            }
-        ]
-    }
+CMD_RE = re.compile(r"CMD \((.*)\)")
+ENV_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*\s*=")  # MAILTO=, PATH=, SHELL=...
 
-    try:
-        requests.post(DISCORD_WEBHOOK, json=data, timeout=10)
-    except Exception as e:
-        print(f"[ERROR] Discord send failed: {e}")
+# ---------------- HELPERS ----------------
+@functools.lru_cache(maxsize=1)
+def crontab_path():
+    """Locate the crontab binary on PATH (cached)."""
+    return shutil.which("crontab")
 
 def get_crontab():
     """Get current user's crontab entries if crontab exists."""
-    if shutil.which("crontab") is None:
+    if crontab_path() is None:
         print("[WARN] 'crontab' command not found, skipping user crontab fetch.")
         return []
     try:
         output = subprocess.check_output(["crontab", "-l"], text=True)
         jobs = []
         for line in output.splitlines():
-            if line.strip() and not line.startswith("#"):
-                jobs.append(line.strip())
+            stripped = line.strip()
+            # skip comments and environment assignments, they are not jobs
+            if stripped and not stripped.startswith("#") and not ENV_RE.match(stripped):
+                jobs.append(stripped)
         return jobs
     except subprocess.CalledProcessError:
         # no crontab entries
         return []
 
+def job_command(job):
+    """Extract the command part of a crontab line (after the 5 time fields or an @schedule)."""
+    if job.startswith("@"):
+        parts = job.split(None, 1)
+        return parts[1] if len(parts) > 1 else ""
+    parts = job.split(None, 5)
+    return parts[5] if len(parts) > 5 else ""
+
+def mkprints(cmd):
+    """Escape a command the way cron's mkprints() does before logging it (tab -> ^I, etc.)."""
+    if cmd.isascii() and cmd.isprintable():
+        return cmd
+    out = []
+    for b in cmd.encode():
+        if b < 0x20:
+            out.append("^" + chr(b + 0x40))  # control character
+        elif b < 0x7F:
+            out.append(chr(b))
+        elif b == 0x7F:
+            out.append("^?")
+        else:
+            out.append(f"\\{b:03o}")  # non-ASCII byte, octal
+    return "".join(out)
+
+def command_key(logged):
+    """Normalise a command as it appears in CMD (...) for matching: collapse whitespace."""
+    key = " ".join(logged.split())
+    while key.endswith("^I"):  # trailing tabs, already stripped from the crontab side
+        key = key[:-2].rstrip()
+    return key
+
+@functools.lru_cache(maxsize=1)
 def detect_scheduler():
-    """Detect whether cron, crond, or fcron is active."""
+    """Detect whether cron, crond, or fcron is active (cached)."""
     services = ["cron.service", "crond.service", "fcron.service"]
+    try:
+        output = subprocess.check_output(
+            ["systemctl", "list-units", "--type=service", "--state=active",
+             "--no-legend", "--plain"] + services,
+            text=True,
+            stderr=subprocess.DEVNULL
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    active = {line.split()[0] for line in output.splitlines() if line.strip()}
     for svc in services:
-        try:
-            subprocess.check_output(["systemctl", "is-active", "--quiet", svc])
+        if svc in active:
             return svc
-        except subprocess.CalledProcessError:
-            continue
     return None
 
 def get_logs(minutes=10):
-    """Fetch recent logs from systemd or fallback to log files."""
+    """Fetch recent cron events from systemd or fallback to log files."""
     svc = detect_scheduler()
     since = f"{minutes}m ago"
 
     if svc:
         try:
-            output = subprocess.check_output(
-                ["journalctl", "-u", svc, "--since", since, "--no-pager"],
-                text=True,
-                stderr=subprocess.DEVNULL
-            )
-            return output.splitlines()
-        except Exception:
+            # with -g the stream is already unit-scoped and pattern-filtered
+            return read_journal(journal_argv(svc, since), None if JOURNAL_GREP else "cron")
+        except (FileNotFoundError, PermissionError, subprocess.CalledProcessError):
             pass
 
     # fallback to common log files
     log_files = ["/var/log/syslog", "/var/log/cron", "/var/log/fcron.log"]
     logs = []
     for lf in log_files:
-        if os.path.exists(lf):
+        # skip missing files and ones untouched during the window
+        if modified_within(lf, minutes):
             try:
-                with open(lf, "r", errors="ignore") as f:
-                    logs.extend(f.readlines()[-500:])  # tail last 500 lines
-            except Exception:
+                logs.extend(tail_file(lf, 500))  # tail last 500 lines
+            except (FileNotFoundError, PermissionError):
                 pass
-    return logs
+    return parse_logs(logs)
 
 def parse_logs(logs):
     """Parse logs into job run events."""
-    events = []
-    for line in logs:
-        if re.search(r"(CRON|cron|fcron)", line):
-            events.append(line)
-    return events
+    # "cron" also covers CRON and fcron, no regex needed
+    return [line for line in logs if "cron" in line.lower()]
 
 def main():
     jobs = get_crontab()
-    logs = get_logs(CHECK_MINUTES)
-    events = parse_logs(logs)
+    events = get_logs(CHECK_MINUTES)
 
     results = []
 
@@ -126,11 +130,32 @@ def main():
             "message": "No crontab entries found or 'crontab' command missing."
         })
 
-    for job in jobs:
-        job_cmd = " ".join(job.split()[5:])  # extract command
-        ran = any(job_cmd in e for e in events)
+    # Single pass over events: mark scheduled commands that ran and collect failures
+    commands = [cmd for cmd in map(job_command, jobs) if cmd]
+    job_keys = {cmd: command_key(mkprints(cmd)) for cmd in commands}
+    ran = dict.fromkeys(job_keys.values(), False)
+    failures = []
+    for e in events:
+        m = CMD_RE.search(e)
+        if m:
+            key = command_key(m.group(1))
+            if key in ran:
+                ran[key] = True
+        if "EXIT STATUS" in e and "EXIT STATUS (0)" not in e:
+            failures.append({
+                "job": "Failure detected",
+                "status": "failed",
+                "message": f"```\n{e}\n```"
+            })
+
+    # only commands with characters cron rewrites can be logged in a form
+    # mkprints() doesn't reproduce exactly, give those a substring search
+    for cmd, key in job_keys.items():
+        if not ran[key] and not (cmd.isascii() and cmd.isprintable()):
+            ran[key] = any(cmd in e or mkprints(cmd) in e for e in events)
 
-        if ran:
+    for job_cmd in commands:
+        if ran[job_keys[job_cmd]]:
             results.append({
                 "job": job_cmd,
                 "status": "success",
@@ -143,16 +168,9 @@ def main():
                 "message": "Did **not run** (but scheduled)."
             })
 
-    # Check failures from logs
-    for e in events:
-        if "EXIT STATUS" in e and not re.search(r"EXIT STATUS \(0\)", e):
-            results.append({
-                "job": "Failure detected",
-                "status": "failed",
-                "message": f"```\n{e}\n```"
-            })
+    results.extend(failures)
 
-    send_discord_report(results)
+    send_discord_report(results, DISCORD_WEBHOOK, "🕒 Cron/Fcron Monitor Report", "cron-monitor")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Shared helpers for cron_checker.py and fcron_checker.py.
+
+Run as `python -m cron_common --mode both` to run both checks in one interpreter.
+"""
+import argparse
+import sys
+import subprocess
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import time
+import os
+import collections
+try:
+    import orjson
+except ImportError:  # optional, stdlib json is fine for one small embed
+    orjson = None
+    import json
+
+# ---------------- CONFIG ----------------
+CHECK_MINUTES = 10  # Look this far back in logs
+JOURNAL_MAX_LINES = 2000  # Cap on lines pulled from journalctl
+JOURNAL_PATTERN = "(CRON|cron|fcron|CMD|EXIT STATUS)"
+STATUS_ICONS = {"success": "✅", "missing": "⚠️", "failed": "❌"}
+MAX_EMBED_FIELDS = 25  # Discord rejects embeds with more fields
+SEVERITY = {"failed": 0, "missing": 1, "success": 2}  # Order kept when fields overflow
+
+def discord_retry():
+    """Retry policy for webhook POSTs: only rate limits (429) and connect failures.
+
+    5xx and read errors are not retried, Discord may already have posted the message.
+    """
+    options = dict(total=3, read=0, backoff_factor=0.3, status_forcelist=[429])
+    try:
+        return Retry(allowed_methods=frozenset(["POST"]), **options)
+    except TypeError:  # urllib3 < 1.26
+        return Retry(method_whitelist=frozenset(["POST"]), **options)
+
+# Reuse one pooled connection for Discord
+SESSION = requests.Session()
+SESSION.headers["User-Agent"] = "cron-monitor"
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=4,
+    max_retries=discord_retry()
+))
+
+# ---------------- HELPERS ----------------
+def journal_supports_grep():
+    """Check whether journalctl was built with PCRE2 (needed for -g)."""
+    try:
+        output = subprocess.check_output(
+            ["journalctl", "--version"],
+            text=True,
+            stderr=subprocess.DEVNULL
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return "+PCRE2" in output
+
+JOURNAL_GREP = journal_supports_grep()
+
+def journal_argv(svc, since):
+    """Build the journalctl command, pushing filtering into journald when possible."""
+    if not JOURNAL_GREP:
+        return ["journalctl", "-u", svc, "--since", since, "--no-pager"]
+    argv = ["journalctl", "-u", svc, "--since", since, "--no-pager",
+            "--output=cat", "-n", str(JOURNAL_MAX_LINES)]
+    if svc == "fcron.service":
+        # fcron's messages ("Job `x' started ...") don't name fcron once --output=cat
+        # drops the prefix, so select by the indexed process name instead of -g
+        argv.append("_COMM=fcron")
+    else:
+        argv += ["-g", JOURNAL_PATTERN]
+    return argv
+
+def read_journal(argv, needle=None):
+    """Stream journalctl output, keeping only lines containing needle (case-insensitive)."""
+    events = []
+    seen_output = False
+    p = subprocess.Popen(
+        argv,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        errors="ignore",
+        bufsize=1 << 16
+    )
+    try:
+        for line in p.stdout:
+            seen_output = True
+            line = line.rstrip("\n")
+            if needle is None or needle in line.lower():
+                events.append(line)
+    finally:
+        p.stdout.close()
+        p.wait()
+    if p.returncode == 1 and "-g" in argv and not seen_output:
+        # journalctl -g exits 1 when nothing matched, that is a quiet window, not an error
+        return []
+    if p.returncode != 0:
+        raise subprocess.CalledProcessError(p.returncode, argv)
+    return events
+
+def encode_json(data):
+    """Serialize a payload to compact JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+def result_key(r):
+    """Grouping key for a result; failures also key on the log line so distinct ones stay separate."""
+    return r["job"], r["status"], r["message"] if r["status"] == "failed" else None
+
+def summarize_results(results):
+    """Collapse repeated results into one entry with a run count."""
+    counts = collections.Counter(result_key(r) for r in results)
+    first = {}
+    for r in results:
+        first.setdefault(result_key(r), r)
+    summary = []
+    for key, n in counts.items():
+        r = first[key]
+        summary.append({
+            "job": f"{r['job']} (×{n})" if n > 1 else r["job"],
+            "status": r["status"],
+            "message": r["message"]
+        })
+    return summary
+
+def send_discord_report(results, webhook, title, footer):
+    """Send a single embed summarizing all jobs."""
+    results = summarize_results(results)
+    # Decide embed color
+    statuses = {r["status"] for r in results}
+    if "failed" in statuses:
+        color = 0xE74C3C  # red
+    elif "missing" in statuses:
+        color = 0xE67E22  # orange
+    else:
+        color = 0x2ECC71  # green
+
+    overflow = []
+    if len(results) > MAX_EMBED_FIELDS:
+        # keep failures and missing jobs visible, summarise the least severe
+        results = sorted(results, key=lambda r: SEVERITY.get(r["status"], 0))
+        results, overflow = results[:MAX_EMBED_FIELDS - 1], results[MAX_EMBED_FIELDS - 1:]
+
+    fields = [
+        {
+            "name": f"{STATUS_ICONS.get(r['status'], '❌')} {r['job']}",
+            "value": r["message"],
+            "inline": False
+        }
+        for r in results
+    ]
+    if overflow:
+        overflow_counts = collections.Counter(r["status"] for r in overflow)
+        fields.append({
+            "name": f"… and {len(overflow)} more",
+            "value": ", ".join(f"{n} {status}" for status, n in overflow_counts.items()),
+            "inline": False
+        })
+
+    data = {
+        "embeds": [
+            {
+                "title": title,
+                "description": f"Checked the last **{CHECK_MINUTES} minutes** of logs.",
+                "color": color,
+                "fields": fields,
+                "footer": {
+                    "text": f"{footer} • {time.strftime('%Y-%m-%d %H:%M:%S')}"
+                }
+            }
+        ]
+    }
+
+    try:
+        SESSION.post(
+            webhook,
+            data=encode_json(data),
+            headers={"Content-Type": "application/json"},
+            timeout=10
+        )
+    except Exception as e:
+        print(f"[ERROR] Discord send failed: {e}")
+
+def tail_file(path, n=500, block=8192):
+    """Return the last n lines of a file, reading backwards from EOF."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        pos = os.fstat(fd).st_size
+        chunks = []
+        newlines = 0
+        while pos > 0 and newlines <= n:
+            step = min(block, pos)
+            pos -= step
+            chunk = os.pread(fd, step, pos)
+            newlines += chunk.count(b"\n")
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    data = b"".join(reversed(chunks)).decode("utf-8", "ignore")
+    return data.splitlines()[-n:]
+
+def modified_within(path, minutes, grace=60):
+    """True if path exists and was written to in the last `minutes` (plus grace seconds)."""
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return False
+    return mtime >= time.time() - minutes * 60 - grace
+
+def main():
+    parser = argparse.ArgumentParser(description="Report cron/fcron job runs to Discord.")
+    parser.add_argument("--mode", choices=["cron", "fcron", "both"], default="both")
+    args = parser.parse_args()
+
+    # imported here, both checkers import this module
+    if args.mode in ("cron", "both"):
+        import cron_checker
+        cron_checker.main()
+    if args.mode in ("fcron", "both"):
+        import fcron_checker
+        fcron_checker.main()
+
+if __name__ == "__main__":
+    # let the checkers' `from cron_common import ...` reuse this module, not load it twice
+    sys.modules.setdefault("cron_common", sys.modules[__name__])
+    main()
@@ -1,88 +1,55 @@
 #!/usr/bin/env python3
-import subprocess
-import requests
-import datetime
 import re
-import os
+import subprocess
+from cron_common import (
+    CHECK_MINUTES, JOURNAL_GREP, journal_argv, read_journal, tail_file,
+    modified_within, send_discord_report
+)
 
 # ---------------- CONFIG ----------------
 DISCORD_WEBHOOK = "https://discord.com/api/webhooks/XXXXXXXXXXXX"
-CHECK_MINUTES = 10  # Look this far back in logs
-
-# ---------------- HELPERS ----------------
-def send_discord_report(results):
-    """Send a single embed summarizing all jobs."""
-    if any(r["status"] == "failed" for r in results):
-        color = 0xE74C3C  # red
-    elif any(r["status"] == "missing" for r in results):
-        color = 0xE67E22  # orange
-    else:
-        color = 0x2ECC71  # green
 
-    fields = []
-    for r in results:
-        status_icon = "✅" if r["status"] == "success" else "⚠️" if r["status"] == "missing" else "❌"
-        fields.append({
-            "name": f"{status_icon} {r['job']}",
-            "value": r["message"],
-            "inline": False
-        })
-
-    data = {
-        "embeds": [
-            {
-                "title": "🕒 Fcron Monitor Report",
-                "description": f"Checked the last **{CHECK_MINUTES} minutes** of logs.",
-                "color": color,
-                "fields": fields,
-                "footer": {
-                    "text": f"fcron-monitor • {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                }
-            }
-        ]
-    }
-
-    try:
-        requests.post(DISCORD_WEBHOOK, json=data, timeout=10)
-    except Exception as e:
-        print(f"[ERROR] Discord send failed: {e}")
+# Matches either token, so one scan of a line finds both the job and its exit code
+FCRON_RE = re.compile(r"CMD \((?P<cmd>.*?)\)|EXIT STATUS \((?P<exit>\d+)\)")
 
+# ---------------- HELPERS ----------------
 def get_fcron_logs(minutes=10):
-    """Fetch recent fcron logs from systemd or fallback to /var/log/fcron.log."""
-    logs = []
+    """Fetch recent fcron events from systemd or fallback to /var/log/fcron.log."""
+    events = []
     # Try journalctl first
     try:
-        output = subprocess.check_output(
-            ["journalctl", "-u", "fcron.service", "--since", f"{minutes}m ago", "--no-pager"],
-            text=True,
-            stderr=subprocess.DEVNULL
-        )
-        logs.extend(output.splitlines())
-    except Exception:
+        # with -g the stream is already unit-scoped and pattern-filtered
+        events.extend(read_journal(journal_argv("fcron.service", f"{minutes}m ago"),
+                                   None if JOURNAL_GREP else "fcron"))
+    except (FileNotFoundError, PermissionError, subprocess.CalledProcessError):
         pass
 
     # Fallback to log file
     log_file = "/var/log/fcron.log"
-    if os.path.exists(log_file):
+    if modified_within(log_file, minutes):
         try:
-            with open(log_file, "r", errors="ignore") as f:
-                logs.extend(f.readlines()[-500:])  # tail last 500 lines
-        except Exception:
+            events.extend(parse_fcron_logs(tail_file(log_file, 500)))  # tail last 500 lines
+        except (FileNotFoundError, PermissionError):
             pass
 
-    return logs
+    return events
 
 def parse_fcron_logs(logs):
     """Parse fcron logs into job events."""
-    events = []
-    for line in logs:
-        if re.search(r"fcron", line, re.IGNORECASE):
-            events.append(line)
-    return events
+    return [line for line in logs if "fcron" in line.lower()]
+
+def parse_event(line):
+    """Return (job name, exit status or None) for an fcron log line in a single scan."""
+    job_name, exit_code = None, None
+    for m in FCRON_RE.finditer(line):
+        if m.group("cmd") is not None and job_name is None:
+            job_name = m.group("cmd")
+        elif m.group("exit") is not None and exit_code is None:
+            exit_code = m.group("exit")
+    return job_name or "Unknown job", exit_code
 
 def main():
-    logs = get_fcron_logs(CHECK_MINUTES)
-    events = parse_fcron_logs(logs)
+    events = get_fcron_logs(CHECK_MINUTES)
     results = []
 
     if not events:
@@ -93,31 +60,22 @@ def main():
         })
     else:
         for e in events:
-            job_match = re.search(r'CMD \((.*?)\)', e)
-            job_name = job_match.group(1) if job_match else "Unknown job"
-            if "EXIT STATUS" in e:
-                exit_match = re.search(r'EXIT STATUS \((\d+)\)', e)
-                if exit_match and exit_match.group(1) != "0":
-                    results.append({
-                        "job": job_name,
-                        "status": "failed",
-                        "message": f"```\n{e}\n```"
-                    })
-                else:
-                    results.append({
-                        "job": job_name,
-                        "status": "success",
-                        "message": "Ran successfully."
-                    })
+            job_name, exit_code = parse_event(e)
+            if exit_code is not None and exit_code != "0":
+                results.append({
+                    "job": job_name,
+                    "status": "failed",
+                    "message": f"```\n{e}\n```"
+                })
             else:
-                # If no EXIT STATUS, assume ran successfully
+                # no or zero EXIT STATUS, assume ran successfully
                 results.append({
                     "job": job_name,
                     "status": "success",
                     "message": "Ran successfully."
                 })
 
-    send_discord_report(results)
+    send_discord_report(results, DISCORD_WEBHOOK, "🕒 Fcron Monitor Report", "fcron-monitor")
 
 if __name__ == "__main__":
     main()